@@ -45,8 +45,9 @@ async def wait_until_logged_in(toolkit: ScraperToolkit):
 
 
 def load_downloaded_urls(out_dir: Path):
-    """从 file_mapping.json 读取已下载URL集合，用于跳过。"""
+    """从 file_mapping.json / file_mapping.jsonl 读取已下载URL集合，用于跳过。"""
     mapping_file = out_dir / 'file_mapping.json'
+    mapping_jsonl = out_dir / 'file_mapping.jsonl'
     urls = set()
     if mapping_file.exists():
         try:
@@ -57,6 +58,15 @@ def load_downloaded_urls(out_dir: Path):
                     urls.add(u)
         except Exception:
             pass
+    if mapping_jsonl.exists():
+        for line in mapping_jsonl.read_text(encoding='utf-8').splitlines():
+            try:
+                for _, v in json.loads(line).items():
+                    u = v.get('url')
+                    if u:
+                        urls.add(u)
+            except Exception:
+                continue
     return urls
 
 
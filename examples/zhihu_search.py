@@ -58,11 +58,12 @@ async def search_zhihu_content():
             if results:
                 print(f"\n3. 前3个搜索结果:")
                 for i, item in enumerate(results[:3], 1):
-                    print(f"   {i}. {item['title']}")
-                    print(f"      作者: {item['author']}")
-                    print(f"      链接: {item['url']}")
-                    print(f"      摘要: {item['summary'][:100]}...")
-                    print()
+                    print(
+                        f"   {i}. {item['title']}\n"
+                        f"      作者: {item['author']}\n"
+                        f"      链接: {item['url']}\n"
+                        f"      摘要: {item['summary'][:100]}...\n"
+                    )
                 
                 # 3. 下载第一个结果
                 if results:
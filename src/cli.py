@@ -7,6 +7,7 @@
 
 import asyncio
 import argparse
+import itertools
 import sys
 from pathlib import Path
 from typing import Optional
@@ -68,6 +69,7 @@ def create_parser():
     batch_parser.add_argument('--max-pages', type=int, default=3, help='最大搜索页数')
     batch_parser.add_argument('--headless', action='store_true', help='无头模式')
     batch_parser.add_argument('--output', type=Path, default=Path('data'), help='输出目录')
+    batch_parser.add_argument('--concurrency', type=int, default=1, help='同时下载的文章数')
     
     # 快速搜索命令
     quick_search_parser = subparsers.add_parser('quick-search', help='快速搜索（便捷函数）')
@@ -111,10 +113,13 @@ async def cmd_search(args):
         if result.get("status") == "success" and result.get("results"):
             results = result["results"]
             print(f"\n找到 {len(results)} 个结果:")
-            for i, item in enumerate(results[:5], 1):
-                print(f"  {i}. {item['title']}")
+            print("\n".join(
+                f"  {i}. {item['title']}" for i, item in enumerate(itertools.islice(results, 5), 1)
+            ))
             
-            if input(f"\n是否下载第一个结果? (y/N): ").lower() == 'y':
+            # 在线程中等待输入，保持事件循环运行（浏览器会话不被挂起）
+            answer = await asyncio.to_thread(input, "\n是否下载第一个结果? (y/N): ")
+            if answer.lower() == 'y':
                 first_result = results[0]
                 download_result = await toolkit.download_content(
                     platform,
@@ -174,7 +179,8 @@ async def cmd_batch(args):
         platform=platform,
         headless=args.headless,
         max_pages=args.max_pages,
-        output_dir=args.output
+        output_dir=args.output,
+        max_concurrency=args.concurrency
     )
     
     toolkit = ScraperToolkit(config)
@@ -226,12 +232,15 @@ async def cmd_quick_search(args):
     if result.get("status") == "success":
         results = result.get("results") or []
         print(f"✅ 搜索完成，共 {len(results)} 条")
-        for i, item in enumerate(results[:5], 1):
+        lines = []
+        for i, item in enumerate(itertools.islice(results, 5), 1):
             title = item.get('title') or '未命名'
             link = item.get('url') or item.get('link')
-            print(f"  {i}. {title}")
+            lines.append(f"  {i}. {title}")
             if link:
-                print(f"     链接: {link}")
+                lines.append(f"     链接: {link}")
+        if lines:
+            print("\n".join(lines))
     else:
         print(f"❌ 搜索失败: {result.get('message')}")
 
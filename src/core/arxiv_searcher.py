@@ -707,9 +707,10 @@ class ArxivSearcher:
                 
                 if result.returncode == 0:
                     # 查找生成的markdown文件
-                    markdown_files = list(temp_output.glob("*.md"))
-                    if markdown_files:
-                        markdown_content = markdown_files[0].read_text(encoding='utf-8')
+                    # 只需要第一个markdown文件，不必列出整个目录
+                    markdown_file = next(temp_output.glob("*.md"), None)
+                    if markdown_file:
+                        markdown_content = markdown_file.read_text(encoding='utf-8')
                         
                         # 保存到正式目录
                         markdown_filename = pdf_path.stem + "_marker.md"
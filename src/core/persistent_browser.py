@@ -281,10 +281,10 @@ class PersistentBrowserManager:
             if state_file.exists():
                 state_file.unlink()
             
-            # 清除用户数据目录
+            # 清除用户数据目录（目录可能很大，在线程中删除以免阻塞事件循环）
             user_data_dir = self._get_user_data_dir(platform, site)
             if user_data_dir.exists():
-                shutil.rmtree(user_data_dir)
+                await asyncio.to_thread(shutil.rmtree, user_data_dir)
             
             print(f"✅ 浏览器状态已清除: {platform}")
             
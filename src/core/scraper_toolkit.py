@@ -40,6 +40,8 @@ class ScrapingConfig:
     output_dir: Path = Path("data")
     timeout: int = 300
     wait_for_verification: bool = True
+    # 批量下载时同时下载的文章数，每篇占用一个浏览器页面
+    max_concurrency: int = 1
 
 
 class ScraperToolkit:
@@ -48,8 +50,8 @@ class ScraperToolkit:
     def __init__(self, config: Optional[ScrapingConfig] = None):
         self.logger = Logger("ScraperToolkit")
         self.config = config or ScrapingConfig(platform=Platform.GENERAL)
-        self.web_scraper = WebScraper()
-        self.wechat_scraper = WeChatScraper()
+        self.web_scraper = WebScraper(page_pool_size=self.config.max_concurrency)
+        self.wechat_scraper = WeChatScraper(page_pool_size=self.config.max_concurrency)
         self._browser_initialized = False
     
     async def setup_browser(self, platform: Platform, headless: bool = None, persistent: bool = None) -> Dict[str, Any]:
@@ -136,7 +138,8 @@ class ScraperToolkit:
                 "message": f"平台 {platform.value} 不支持内容下载功能"
             }
     
-    async def batch_download(self, platform: Platform, query: str, output_dir: Path = None, max_pages: int = None) -> Dict[str, Any]:
+    async def batch_download(self, platform: Platform, query: str, output_dir: Path = None, max_pages: int = None,
+                             max_concurrency: int = None) -> Dict[str, Any]:
         """批量下载搜索结果"""
         if not self._browser_initialized:
             await self.setup_browser(platform)
@@ -147,11 +150,13 @@ class ScraperToolkit:
             max_pages = None
         else:
             max_pages = max_pages or self.config.max_pages
+        max_concurrency = max_concurrency or self.config.max_concurrency
         
         if platform == Platform.ZHIHU:
-            return await self.web_scraper.batch_download_content(query, output_dir, max_pages)
+            return await self.web_scraper.batch_download_content(query, output_dir, max_pages,
+                                                                 max_concurrency=max_concurrency)
         elif platform == Platform.WECHAT:
-            return await self.wechat_scraper.batch_download_content(query, output_dir, max_pages)
+            return await self.wechat_scraper.batch_download_content(query, output_dir, max_pages, max_concurrency)
         else:
             return {
                 "status": "error",
@@ -225,10 +230,12 @@ async def quick_download(platform: str, url: str, output_dir: str = "data", head
         await toolkit.cleanup()
 
 
-async def quick_batch_download(platform: str, query: str, output_dir: str = "data", max_pages: int = 3, headless: bool = False) -> Dict[str, Any]:
+async def quick_batch_download(platform: str, query: str, output_dir: str = "data", max_pages: int = 3, headless: bool = False,
+                               max_concurrency: int = 1) -> Dict[str, Any]:
     """快速批量下载功能"""
     platform_enum = Platform(platform)
-    config = ScrapingConfig(platform=platform_enum, headless=headless, max_pages=max_pages, output_dir=Path(output_dir))
+    config = ScrapingConfig(platform=platform_enum, headless=headless, max_pages=max_pages, output_dir=Path(output_dir),
+                            max_concurrency=max_concurrency)
     toolkit = ScraperToolkit(config)
     
     try:
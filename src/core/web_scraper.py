@@ -1,5 +1,6 @@
 """网页抓取模块"""
 import asyncio
+import random
 import re
 import json
 from datetime import datetime
@@ -7,15 +8,51 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 from playwright.async_api import async_playwright
 
+from src.utils.file_utils import clean_filename, discard_placeholder, generate_unique_filename, json_bytes, json_loads
+from src.utils.logger import Logger
+from src.utils.page_pool import PagePool
+
+# 知乎页面使用的真实浏览器请求头
+ZHIHU_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+    "DNT": "1",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Cache-Control": "max-age=0"
+}
+
+# 批量下载遇到限流 (HTTP 429) 时的最大重试次数与退避基数（秒）
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 5.0
+
+# 批量下载期间文件映射每累计多少条更新写盘一次
+MAPPING_FLUSH_EVERY = 16
+
 
 class WebScraper:
     """最基础的网页抓取类"""
     
-    def __init__(self):
+    def __init__(self, page_pool_size: int = 1):
         self.name = "WebScraper"
         self.playwright = None
         self.zhihu_context = None
         self.zhihu_page = None
+        self.logger = Logger("WebScraper")
+        # 知乎页面池：读取和打印页面时借用，用完归还而非关闭
+        self.page_pool_size = max(1, page_pool_size)
+        self._page_pool: Optional[PagePool] = None
+        # 文件映射缓存：映射文件路径 -> 映射数据，及尚未写盘的更新条数
+        self._mappings: Dict[Path, Dict[str, Any]] = {}
+        self._dirty_mappings: Dict[Path, int] = {}
+        self._batch_depth = 0
+        self._mapping_lock = asyncio.Lock()
     
     async def test_connection(self) -> Dict[str, Any]:
         """测试连接方法 - 最基础的功能"""
@@ -85,6 +122,25 @@ class WebScraper:
             user_data_dir = Path(__file__).parent.parent.parent / "data" / "browser_data" / "zhihu_stealth"
             user_data_dir.mkdir(parents=True, exist_ok=True)
             
+            # 已有打开的知乎浏览器时直接复用，避免重复启动浏览器和重复扫码
+            if self.zhihu_context and self.zhihu_page and not self.zhihu_page.is_closed():
+                # 从页面池借用页面，避免打断正在进行的下载；页面可能停留在下载过的文章上
+                # （作者链接会被误判为已登录），先回到首页再检测
+                async with self._borrow_page() as page:
+                    await page.goto("https://www.zhihu.com", timeout=60000)
+                    await page.wait_for_load_state("networkidle", timeout=60000)
+                    login_status = await self._detect_zhihu_login_status(page)
+                if login_status in ("logged_in", "waiting_for_login"):
+                    logged_in = login_status == "logged_in"
+                    return {
+                        "status": "success" if logged_in else "waiting",
+                        "message": "知乎已登录" if logged_in else "请在浏览器中手动扫码登录",
+                        "login_status": login_status,
+                        "user_data_dir": str(user_data_dir)
+                    }
+                # 状态异常时关闭旧浏览器，释放用户数据目录后重新启动
+                await self.zhihu_context.close()
+            
             # 如果还没有playwright实例，创建一个
             if not self.playwright:
                 self.playwright = await async_playwright().start()
@@ -134,22 +190,10 @@ class WebScraper:
             )
             
             self.zhihu_page = self.zhihu_context.pages[0] if self.zhihu_context.pages else await self.zhihu_context.new_page()
+            self._page_pool = None
             
             # 设置真实的用户代理和完整的HTTP头
-            await self.zhihu_page.set_extra_http_headers({
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "DNT": "1",
-                "Connection": "keep-alive",
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "none",
-                "Sec-Fetch-User": "?1",
-                "Cache-Control": "max-age=0"
-            })
+            await self.zhihu_page.set_extra_http_headers(ZHIHU_HTTP_HEADERS)
             
             # 设置视口大小
             await self.zhihu_page.set_viewport_size({"width": 1920, "height": 1080})
@@ -286,32 +330,55 @@ class WebScraper:
     
 
     
+    def _borrow_page(self):
+        """从知乎页面池借用一个页面，使用完毕后归还"""
+        if self._page_pool is None:
+            self._page_pool = PagePool(self.zhihu_page, self.page_pool_size, self._new_pool_page)
+        return self._page_pool.borrow()
+    
+    async def _new_pool_page(self):
+        """为知乎页面池创建额外页面"""
+        page = await self.zhihu_context.new_page()
+        await page.set_extra_http_headers(ZHIHU_HTTP_HEADERS)
+        await page.set_viewport_size({"width": 1920, "height": 1080})
+        return page
+    
     async def read_zhihu_page(self, url: str = "https://www.zhihu.com") -> Dict[str, Any]:
         """读取知乎网页内容（需要已登录）- 使用PDF转Markdown方法"""
+        # 检查是否有已打开的知乎浏览器
+        if not self.zhihu_context or not self.zhihu_page:
+            return {
+                "status": "error",
+                "message": "知乎未登录，请先登录"
+            }
+        
+        async with self._borrow_page() as page:
+            return await self._read_zhihu_page(page, url)
+    
+    async def _read_zhihu_page(self, page, url: str) -> Dict[str, Any]:
+        """使用指定页面读取知乎网页内容"""
         try:
-            # 检查是否有已打开的知乎浏览器
-            if not self.zhihu_context or not self.zhihu_page:
+            # 使用已打开的浏览器访问指定页面
+            response = await page.goto(url)
+            if response is not None and response.status == 429:
                 return {
                     "status": "error",
-                    "message": "知乎未登录，请先登录"
+                    "message": "知乎请求过于频繁 (HTTP 429)",
+                    "rate_limited": True
                 }
-            
-            # 使用已打开的浏览器访问指定页面
-            await self.zhihu_page.goto(url)
-            await self.zhihu_page.wait_for_load_state("networkidle")
+            await page.wait_for_load_state("networkidle")
             
             # 模拟人类行为 - 随机等待
-            import random
-            await self.zhihu_page.wait_for_timeout(random.randint(2000, 5000))
+            await page.wait_for_timeout(random.randint(2000, 5000))
             
             # 模拟鼠标移动
-            await self.zhihu_page.mouse.move(random.randint(100, 800), random.randint(100, 600))
+            await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
             
             # 再次等待
-            await self.zhihu_page.wait_for_timeout(random.randint(1000, 2000))
+            await page.wait_for_timeout(random.randint(1000, 2000))
             
             # 简化登录状态检测 - 如果页面能正常加载，就认为已登录
-            current_url = self.zhihu_page.url
+            current_url = page.url
             if "login" in current_url.lower() or "signin" in current_url.lower():
                 return {
                     "status": "error",
@@ -319,15 +386,16 @@ class WebScraper:
                 }
             
             # 获取页面标题
-            title = await self.zhihu_page.title()
+            title = await page.title()
             
             # 使用PDF转Markdown方法
-            pdf_result = await self.print_page_to_pdf(url)
+            pdf_result = await self._print_page_to_pdf(page, url)
             if pdf_result["status"] != "success":
                 return {
                     "status": "error",
                     "message": f"PDF打印失败: {pdf_result['message']}",
-                    "url": url
+                    "url": url,
+                    "rate_limited": pdf_result.get("rate_limited", False)
                 }
             
             markdown_result = await self.pdf_to_markdown(pdf_result['pdf_path'])
@@ -361,21 +429,31 @@ class WebScraper:
     
     async def print_page_to_pdf(self, url: str = "https://www.zhihu.com", output_path: str = None) -> Dict[str, Any]:
         """将知乎页面打印成PDF"""
+        # 检查是否有已打开的知乎浏览器
+        if not self.zhihu_context or not self.zhihu_page:
+            return {
+                "status": "error",
+                "message": "知乎未登录，请先登录"
+            }
+        
+        async with self._borrow_page() as page:
+            return await self._print_page_to_pdf(page, url, output_path)
+    
+    async def _print_page_to_pdf(self, page, url: str, output_path: str = None) -> Dict[str, Any]:
+        """使用指定页面将知乎页面打印成PDF"""
         try:
-            # 检查是否有已打开的知乎浏览器
-            if not self.zhihu_context or not self.zhihu_page:
+            # 使用已打开的浏览器访问指定页面
+            response = await page.goto(url)
+            if response is not None and response.status == 429:
                 return {
                     "status": "error",
-                    "message": "知乎未登录，请先登录"
+                    "message": "知乎请求过于频繁 (HTTP 429)",
+                    "rate_limited": True
                 }
-            
-            # 使用已打开的浏览器访问指定页面
-            await self.zhihu_page.goto(url)
-            await self.zhihu_page.wait_for_load_state("networkidle")
+            await page.wait_for_load_state("networkidle")
             
             # 模拟人类行为 - 随机等待
-            import random
-            await self.zhihu_page.wait_for_timeout(random.randint(2000, 5000))
+            await page.wait_for_timeout(random.randint(2000, 5000))
             
             # 生成PDF文件路径
             from pathlib import Path
@@ -387,7 +465,7 @@ class WebScraper:
             pdf_path.parent.mkdir(parents=True, exist_ok=True)
             
             # 使用浏览器打印功能生成PDF
-            await self.zhihu_page.pdf(
+            await page.pdf(
                 path=str(pdf_path),
                 format='A4',
                 print_background=True,
@@ -814,52 +892,17 @@ class WebScraper:
 
     def clean_filename(self, title: str) -> str:
         """清理文件名，移除不合法字符并处理长度限制"""
-        if not title:
-            return "untitled"
-        
-        # 1. 移除特殊字符: < > : " / \ | ? *
-        title = re.sub(r'[<>:"/\\|?*]', '_', title)
-        
-        # 2. 替换多个空格为单个下划线
-        title = re.sub(r'\s+', '_', title)
-        
-        # 3. 移除中文标点符号并替换为下划线
-        title = re.sub(r'[，。！？；：""''【】《》（）]', '_', title)
-        
-        # 4. 移除连续的下划线
-        title = re.sub(r'_+', '_', title)
-        
-        # 5. 移除首尾的下划线和点
-        title = title.strip('_.')
-        
-        # 6. 限制文件名长度 (≤100字符)
-        if len(title) > 100:
-            title = title[:97] + "..."
-        
-        # 7. 如果清理后为空，使用默认名称
-        if not title:
-            title = "untitled"
-            
-        return title
+        return clean_filename(title)
     
     def _generate_unique_filename(self, base_name: str, extension: str, output_dir: Path) -> str:
-        """生成唯一的文件名，处理重复文件名"""
-        file_path = output_dir / f"{base_name}{extension}"
-        
-        if not file_path.exists():
-            return f"{base_name}{extension}"
-        
-        # 如果文件已存在，添加序号
-        counter = 1
-        while True:
-            new_name = f"{base_name}_{counter}{extension}"
-            new_path = output_dir / new_name
-            if not new_path.exists():
-                return new_name
-            counter += 1
+        """生成唯一的文件名，并以独占方式创建空占位文件预留该文件名"""
+        return generate_unique_filename(base_name, extension, output_dir)
     
     async def download_and_save_content(self, url: str, output_dir: Path, title: Optional[str] = None) -> Dict[str, Any]:
         """下载知乎内容并保存为PDF和Markdown文件"""
+        # 预留的PDF文件名，保存失败时删除其空占位文件
+        target_pdf_path = None
+        saved = False
         try:
             # 1. 确保输出目录存在
             pdf_dir = output_dir / "pdfs"
@@ -870,6 +913,12 @@ class WebScraper:
             # 2. 直接生成PDF到目标位置
             # 先确定文件名
             page_result = await self.read_zhihu_page(url)
+            if page_result.get("rate_limited"):
+                return {
+                    "status": "error",
+                    "message": page_result["message"],
+                    "rate_limited": True
+                }
             page_title = ""
             if page_result["status"] == "success":
                 page_title = page_result.get("title", "")
@@ -882,21 +931,21 @@ class WebScraper:
             # 清理文件名
             clean_title = self.clean_filename(final_title)
             
-            # 生成唯一文件名
+            # 生成唯一文件名（立即预留，避免并发下载同名文章时互相覆盖）
             pdf_filename = self._generate_unique_filename(clean_title, ".pdf", pdf_dir)
-            markdown_filename = self._generate_unique_filename(clean_title, ".md", markdown_dir)
+            target_pdf_path = pdf_dir / pdf_filename
             
             # 确保PDF和Markdown使用相同的基础名称
             base_name = pdf_filename.replace(".pdf", "")
             markdown_filename = f"{base_name}.md"
             
             # 直接生成PDF到目标位置
-            target_pdf_path = pdf_dir / pdf_filename
             pdf_result = await self.print_page_to_pdf(url, str(target_pdf_path))
             if pdf_result["status"] != "success":
                 return {
                     "status": "error",
-                    "message": f"PDF生成失败: {pdf_result['message']}"
+                    "message": f"PDF生成失败: {pdf_result['message']}",
+                    "rate_limited": pdf_result.get("rate_limited", False)
                 }
             
             # 验证PDF文件是否真正创建
@@ -925,21 +974,13 @@ class WebScraper:
 {markdown_result['markdown_content']}
 """
             
+            # 在线程中写入，避免阻塞其他并发下载
             markdown_path = markdown_dir / markdown_filename
-            with open(markdown_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            await asyncio.to_thread(markdown_path.write_text, markdown_content, encoding='utf-8')
             
-            # 更新文件映射
+            # 更新文件映射（内存中更新，批量下载期间合并写盘）
             mapping_file = output_dir / "file_mapping.json"
-            mapping_data = {}
-            
-            if mapping_file.exists():
-                try:
-                    with open(mapping_file, 'r', encoding='utf-8') as f:
-                        mapping_data = json.load(f)
-                except:
-                    mapping_data = {}
-            
+            mapping_data = await self._get_mapping(mapping_file)
             mapping_data[base_name] = {
                 "original_title": final_title,
                 "clean_title": clean_title,
@@ -949,8 +990,11 @@ class WebScraper:
                 "download_time": datetime.now().isoformat()
             }
             
-            with open(mapping_file, 'w', encoding='utf-8') as f:
-                json.dump(mapping_data, f, ensure_ascii=False, indent=2)
+            pending = self._dirty_mappings.get(mapping_file, 0) + 1
+            self._dirty_mappings[mapping_file] = pending
+            if not self._batch_depth or pending >= MAPPING_FLUSH_EVERY:
+                await self.flush_mapping(mapping_file)
+            saved = True
             
             return {
                 "status": "success",
@@ -973,9 +1017,48 @@ class WebScraper:
                 "url": url,
                 "error": str(e)
             }
+        finally:
+            if target_pdf_path is not None and not saved:
+                discard_placeholder(target_pdf_path)
+    
+    async def _get_mapping(self, mapping_file: Path) -> Dict[str, Any]:
+        """获取文件映射数据，首次访问时在线程中从磁盘加载"""
+        mapping_data = self._mappings.get(mapping_file)
+        if mapping_data is None:
+            mapping_data = {}
+            if mapping_file.exists():
+                # 只在读取失败或内容损坏时回退为空映射；加载被取消时异常直接抛出，
+                # 不缓存空映射，避免下次写盘覆盖已有记录
+                try:
+                    mapping_data = json_loads(await asyncio.to_thread(mapping_file.read_bytes))
+                except (OSError, ValueError):
+                    mapping_data = {}
+            # 并发的首次加载以先完成者为准，保证所有下载共享同一份映射
+            mapping_data = self._mappings.setdefault(mapping_file, mapping_data)
+        return mapping_data
+    
+    async def flush_mapping(self, mapping_file: Optional[Path] = None):
+        """将有未写盘更新的文件映射写入磁盘，未指定时写入全部"""
+        # 串行写盘，避免较旧的快照覆盖较新的快照
+        async with self._mapping_lock:
+            targets = [mapping_file] if mapping_file is not None else list(self._dirty_mappings)
+            for target in targets:
+                if self._dirty_mappings.pop(target, None) is None:
+                    continue
+                # 在事件循环中完成序列化，保证写出的是当前完整快照
+                data = json_bytes(self._mappings[target])
+                await asyncio.to_thread(target.write_bytes, data)
+    
+    async def cleanup(self):
+        """清理资源：写入尚未落盘的文件映射"""
+        await self.flush_mapping()
     
-    async def batch_download_content(self, query: str, output_dir: Path, max_pages: int = 3, min_relevance: float = 0.5) -> Dict[str, Any]:
-        """批量下载知乎搜索结果"""
+    async def batch_download_content(self, query: str, output_dir: Path, max_pages: int = 3, min_relevance: float = 0.5,
+                                     max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """批量下载知乎搜索结果
+        
+        max_concurrency 控制同时下载的文章数，默认等于页面池大小
+        """
         try:
             # 1. 搜索内容
             search_result = await self.search_zhihu(query, max_pages, min_relevance)
@@ -993,43 +1076,77 @@ class WebScraper:
                     "message": "没有找到符合条件的结果"
                 }
             
-            # 2. 批量下载
-            success_count = 0
-            failed_count = 0
-            download_results = []
+            # 2. 批量下载（信号量限制并发数）
+            semaphore = asyncio.Semaphore(max(1, max_concurrency or self.page_pool_size))
+            total = len(results)
             
-            for i, article in enumerate(results, 1):
+            async def download_one(i: int, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 url = article.get("url", "")
                 title = article.get("title", "")
                 
                 if not url:
-                    failed_count += 1
-                    continue
+                    return None
                 
-                print(f"下载第 {i}/{len(results)} 篇: {title}")
-                
-                # 下载单篇文章
-                download_result = await self.download_and_save_content(url, output_dir, title)
+                async with semaphore:
+                    # 随机等待，避免请求过快
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+                    self.logger.info("下载第 %d/%d 篇: %s", i, total, title)
+                    
+                    # 下载单篇文章，被限流时指数退避后重试
+                    for attempt in range(RATE_LIMIT_RETRIES + 1):
+                        download_result = await self.download_and_save_content(url, output_dir, title)
+                        if not download_result.get("rate_limited") or attempt == RATE_LIMIT_RETRIES:
+                            break
+                        backoff = RATE_LIMIT_BACKOFF * 2 ** attempt + random.uniform(0, 1)
+                        self.logger.warning("请求被限流，%.1f 秒后重试: %s", backoff, title)
+                        await asyncio.sleep(backoff)
                 
                 if download_result["status"] == "success":
-                    success_count += 1
-                    download_results.append({
+                    return {
                         "title": title,
                         "url": url,
                         "status": "success",
                         "files": download_result["files"]
-                    })
-                else:
+                    }
+                return {
+                    "title": title,
+                    "url": url,
+                    "status": "failed",
+                    "error": download_result.get("message", "未知错误")
+                }
+            
+            self._batch_depth += 1
+            try:
+                outcomes = await asyncio.gather(
+                    *[download_one(i, article) for i, article in enumerate(results, 1)],
+                    return_exceptions=True
+                )
+            finally:
+                self._batch_depth -= 1
+                await self.flush_mapping()
+            
+            success_count = 0
+            failed_count = 0
+            download_results = []
+            
+            for article, outcome in zip(results, outcomes):
+                if outcome is None:
                     failed_count += 1
-                    download_results.append({
-                        "title": title,
-                        "url": url,
+                    continue
+                
+                if isinstance(outcome, Exception):
+                    outcome = {
+                        "title": article.get("title", ""),
+                        "url": article.get("url", ""),
                         "status": "failed",
-                        "error": download_result.get("message", "未知错误")
-                    })
+                        "error": str(outcome)
+                    }
                 
-                # 等待一下，避免请求过快
-                await asyncio.sleep(1)
+                if outcome["status"] == "success":
+                    success_count += 1
+                else:
+                    failed_count += 1
+                download_results.append(outcome)
             
             # 3. 生成批量下载总结
             summary = {
@@ -7,31 +7,121 @@
 """
 
 import asyncio
+import itertools
+import os
 import re
 import json
+import string
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import random
 try:
     from playwright.async_api import async_playwright
-except ImportError:
-    print("❌ Playwright 未安装，正在自动安装...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
-    subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
-    from playwright.async_api import async_playwright
-import random
+except ImportError as e:
+    raise ImportError(
+        "Playwright 未安装，请先运行: pip install playwright && python -m playwright install chromium"
+    ) from e
 
+from src.utils.file_utils import clean_filename, discard_placeholder, generate_unique_filename, json_bytes
 from src.utils.logger import Logger
+from src.utils.page_pool import PagePool
 from src.core.advanced_stealth import AdvancedStealth
 
+# 可选的PDF文本提取后端：设置 PDF_BACKEND=pypdfium2 启用，未安装时回退到PyPDF2
+try:
+    import pypdfium2 as pdfium
+    PYPDFIUM2_AVAILABLE = True
+except ImportError:
+    PYPDFIUM2_AVAILABLE = False
+
+PDF_BACKEND = os.getenv('PDF_BACKEND', 'pypdf2').lower()
+
+# pdfium库非线程安全，所有调用（打开、提取、关闭）都必须串行执行
+_PDFIUM_LOCK = threading.Lock()
+
+# 可选的HTML转Markdown，可用时直接从页面DOM提取正文，省去PDF解析
+try:
+    from markdownify import markdownify as html_to_markdown
+    MARKDOWNIFY_AVAILABLE = True
+except ImportError:
+    MARKDOWNIFY_AVAILABLE = False
+
+# 微信文章正文节点
+ARTICLE_CONTENT_JS = "() => { const el = document.querySelector('#js_content'); return el ? el.outerHTML : null; }"
+
+# 文件映射后台写入每批最多合并的记录数
+MAPPING_FLUSH_BATCH = 64
+
+# 预编译的正则表达式，避免在逐行清理时重复查找正则缓存
+_WHITESPACE = re.compile(r'\s+')
+# 标题行特征：包含冒号或常见栏目关键词
+_TITLE_HINT = re.compile(r'[:：]|文章|内容|作者|时间')
+# 标题行首字母判断只看ASCII大写，避免中文行逐行查询Unicode属性表
+_ASCII_UPPER = frozenset(string.ascii_uppercase)
+
+
+def _append_bytes(path: Path, data: bytes) -> None:
+    """以追加模式写入字节数据"""
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def _clean_pdf_lines(page_texts: Iterable[str]) -> Iterator[str]:
+    """逐行清理PDF文本并标记可能的标题行，按需产出Markdown行"""
+    for page_text in page_texts:
+        for line in page_text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            
+            # 移除多余的空白字符
+            line = _WHITESPACE.sub(' ', line)
+            
+            # 检测可能的标题
+            is_title = len(line) > 10 and (line[:1] in _ASCII_UPPER or _TITLE_HINT.search(line) is not None)
+            yield f"## {line}" if is_title else line
+
+
+def _write_markdown(path: Path, header: str, body_lines: Iterable[str]) -> None:
+    """先写入文件头，再逐行写入正文（行间空一行），不在内存中拼接完整内容"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(header)
+        for i, line in enumerate(body_lines):
+            if i:
+                f.write("\n\n")
+            f.write(line)
+        f.write("\n")
+
+
+def _extract_pdf_texts_pdfium(pdf_path: str) -> List[str]:
+    """使用pypdfium2按页提取PDF文本（持有全局锁，多个线程同时调用时串行执行）"""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return [pdf[i].get_textpage().get_text_range().replace('\r\n', '\n') for i in range(len(pdf))]
+        finally:
+            pdf.close()
+
+
+def _extract_pdf_texts(pdf_path: str) -> List[str]:
+    """按页提取PDF文本（在线程中调用，避免阻塞事件循环）"""
+    if PDF_BACKEND == 'pypdfium2' and PYPDFIUM2_AVAILABLE:
+        return _extract_pdf_texts_pdfium(pdf_path)
+    
+    import PyPDF2
+    
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [page.extract_text() or "" for page in pdf_reader.pages]
+
 
 class WeChatScraper:
     """微信内容抓取类"""
     
-    def __init__(self):
+    def __init__(self, page_pool_size: int = 1):
         self.logger = Logger("WeChatScraper")
         self.playwright = None
         self.browser = None
@@ -40,6 +130,16 @@ class WeChatScraper:
         self.base_url = "https://weixin.sogou.com"
         self.user_data_dir = None
         self.stealth = AdvancedStealth()
+        # PDF文件名序号，保证同一秒内批量生成的文件名不冲突
+        self._pdf_seq = itertools.count()
+        # 页面池：读取和打印页面时借用，用完归还而非关闭
+        self.page_pool_size = max(1, page_pool_size)
+        self._page_pool: Optional[PagePool] = None
+        # 文件映射写入队列：下载任务只入队，由后台任务批量追加写入
+        self._mapping_queue: Optional[asyncio.Queue] = None
+        self._mapping_writer_task: Optional[asyncio.Task] = None
+        # 追加映射记录与合并映射文件互斥，避免合并时丢失正在追加的记录
+        self._mapping_file_lock = asyncio.Lock()
     
     async def test_connection(self) -> Dict[str, Any]:
         """测试连接方法"""
@@ -216,8 +316,9 @@ class WeChatScraper:
                 "error": str(e)
             }
     
-    async def _check_captcha(self) -> Dict[str, Any]:
+    async def _check_captcha(self, page=None) -> Dict[str, Any]:
         """检查是否需要验证码"""
+        page = page or self.page
         try:
             # 检查各种验证码类型
             captcha_selectors = [
@@ -235,7 +336,7 @@ class WeChatScraper:
             ]
             
             for selector, captcha_type in captcha_selectors:
-                captcha_element = await self.page.query_selector(selector)
+                captcha_element = await page.query_selector(selector)
                 if captcha_element:
                     return {
                         "has_captcha": True,
@@ -244,7 +345,7 @@ class WeChatScraper:
                     }
             
             # 检查页面标题是否包含验证码相关文字
-            title = await self.page.title()
+            title = await page.title()
             if any(keyword in title for keyword in ["验证码", "captcha", "验证", "安全验证", "搜狗搜索"]):
                 return {
                     "has_captcha": True,
@@ -253,7 +354,7 @@ class WeChatScraper:
                 }
             
             # 检查页面内容是否包含验证码相关文字
-            content = await self.page.content()
+            content = await page.content()
             if any(keyword in content for keyword in ["验证码", "captcha", "请依次点击", "安全验证"]):
                 return {
                     "has_captcha": True,
@@ -305,8 +406,9 @@ class WeChatScraper:
             self.logger.error(f"验证码绕过失败: {e}")
             return {"success": False, "error": str(e)}
     
-    async def wait_for_manual_verification(self, timeout: int = None) -> Dict[str, Any]:
+    async def wait_for_manual_verification(self, timeout: int = None, page=None) -> Dict[str, Any]:
         """等待人工验证完成"""
+        page = page or self.page
         try:
             if timeout is None:
                 self.logger.info("等待人工验证完成，无超时限制，将一直等待直到验证完成...")
@@ -318,16 +420,16 @@ class WeChatScraper:
             
             while timeout is None or time.time() - start_time < timeout:
                 # 检查当前页面状态
-                current_url = self.page.url
-                title = await self.page.title()
-                content = await self.page.content()
+                current_url = page.url
+                title = await page.title()
+                content = await page.content()
                 
                 # 检查是否还在验证页面
                 if "antispider" in current_url or "验证码" in title or "captcha" in content.lower():
                     self.logger.info(f"仍在验证页面，等待用户完成验证... (已等待 {int(time.time() - start_time)}秒)")
                     
                     # 模拟人类行为，让用户看到我们在等待
-                    await self.stealth.simulate_human_behavior(self.page, duration=2)
+                    await self.stealth.simulate_human_behavior(page, duration=2)
                     
                     # 等待一段时间后重试
                     await asyncio.sleep(5)
@@ -434,7 +536,7 @@ class WeChatScraper:
             if summary_element:
                 summary = await summary_element.inner_text()
                 # 清理摘要文本
-                summary = re.sub(r'\s+', ' ', summary).strip()
+                summary = _WHITESPACE.sub(' ', summary).strip()
             
             # 提取作者
             author_element = await item.query_selector(".s-p .account")
@@ -550,107 +652,121 @@ class WeChatScraper:
             self.logger.error(f"去重失败: {e}")
             return results
     
-    async def read_wechat_page(self, url: str) -> Dict[str, Any]:
-        """读取微信页面内容"""
-        try:
-            if not self.page:
-                return {
-                    "status": "error",
-                    "message": "浏览器未初始化，请先调用setup_browser"
-                }
+    def _borrow_page(self):
+        """从页面池借用一个页面，使用完毕后归还"""
+        if self._page_pool is None:
+            self._page_pool = PagePool(self.page, self.page_pool_size, self._new_pool_page)
+        return self._page_pool.borrow()
+    
+    async def _new_pool_page(self):
+        """为页面池创建额外页面"""
+        if self.user_data_dir:
+            return await self.context.new_page()
+        return await self.stealth.setup_stealth_page(self.context)
+    
+    async def _open_article(self, page, url: str) -> Dict[str, Any]:
+        """使用指定页面打开微信文章：处理搜狗重定向链接，遇到验证码/反爬页面时等待人工验证
+        
+        成功时返回最终的文章URL和标题；失败或停留在验证码页面时返回错误信息（不应继续生成PDF）
+        """
+        is_sogou_link = "weixin.sogou.com/link?" in url
+        if is_sogou_link:
+            self.logger.info(f"处理搜狗重定向链接: {url}")
+        
+        # 访问页面前先模拟人类行为
+        await self.stealth.simulate_human_behavior(page, duration=2)
+        
+        # 访问页面（搜狗链接会重定向到微信文章）
+        await page.goto(url)
+        await page.wait_for_load_state("networkidle")
+        
+        if is_sogou_link:
+            # 高级等待策略，等待重定向完成
+            await self.stealth.random_delay(5000, 8000)
             
-            # 处理搜狗重定向链接
-            if "weixin.sogou.com/link?" in url:
-                self.logger.info(f"处理搜狗重定向链接: {url}")
-                
-                # 先模拟人类行为
-                await self.stealth.simulate_human_behavior(self.page, duration=2)
-                
-                # 先访问搜狗链接，等待重定向
-                await self.page.goto(url)
-                await self.page.wait_for_load_state("networkidle")
-                
-                # 高级等待策略
-                await self.stealth.random_delay(5000, 8000)
-                
-                # 模拟人类浏览行为
-                await self.stealth.simulate_human_behavior(self.page, duration=3)
+            # 模拟人类浏览行为
+            await self.stealth.simulate_human_behavior(page, duration=3)
+        
+        current_url = page.url
+        if "mp.weixin.qq.com" not in current_url and (is_sogou_link or "antispider" in current_url):
+            # 搜狗链接未重定向到微信文章，检查是否停在了反爬或验证码页面
+            title = await page.title()
+            if "antispider" in current_url or "搜狗搜索" in title or "验证码" in title:
+                self.logger.info("检测到验证码，等待人工验证完成...")
+                verification_result = await self.wait_for_manual_verification(timeout=None, page=page)
+                current_url = page.url
+                if not verification_result["success"]:
+                    return {
+                        "status": "error",
+                        "message": f"等待人工验证超时，当前URL: {current_url}",
+                        "has_captcha": True,
+                        "current_url": current_url,
+                        "verification_result": verification_result
+                    }
                 
-                # 检查是否重定向到了真正的微信文章
-                current_url = self.page.url
-                if "mp.weixin.qq.com" in current_url:
-                    # 成功重定向到微信文章
-                    url = current_url
-                    self.logger.info(f"成功重定向到微信文章: {url}")
-                else:
-                    # 可能遇到了验证码或其他问题
-                    title = await self.page.title()
-                    if "搜狗搜索" in title or "验证码" in title:
-                        # 等待人工验证完成
-                        self.logger.info("检测到验证码，等待人工验证完成...")
-                        verification_result = await self.wait_for_manual_verification(timeout=None)
-                        
-                        if verification_result["success"]:
-                            current_url = self.page.url
-                            if "mp.weixin.qq.com" in current_url:
-                                url = current_url
-                                self.logger.info(f"人工验证后成功重定向到微信文章: {url}")
-                            else:
-                                return {
-                                    "status": "error",
-                                    "message": f"人工验证后仍无法访问微信文章，当前URL: {current_url}",
-                                    "has_captcha": True,
-                                    "current_url": current_url,
-                                    "title": title,
-                                    "verification_result": verification_result
-                                }
-                        else:
-                            return {
-                                "status": "error",
-                                "message": f"等待人工验证超时，当前URL: {current_url}",
-                                "has_captcha": True,
-                                "current_url": current_url,
-                                "title": title,
-                                "verification_result": verification_result
-                            }
-                    else:
-                        return {
-                            "status": "error",
-                            "message": f"重定向失败，当前URL: {current_url}",
-                            "current_url": current_url
-                        }
-            else:
-                # 直接访问微信文章
-                await self.page.goto(url)
-                await self.page.wait_for_load_state("networkidle")
-            
-            # 高级反爬虫等待策略
-            await self.stealth.random_delay(3000, 6000)
-            
-            # 模拟人类行为
-            await self.stealth.simulate_human_behavior(self.page, duration=4)
-            
-            # 获取页面标题
-            title = await self.page.title()
-            
-            # 检查是否是微信文章页面
-            if "搜狗搜索" in title or "验证码" in title:
+                if is_sogou_link and "mp.weixin.qq.com" not in current_url:
+                    return {
+                        "status": "error",
+                        "message": f"人工验证后仍无法访问微信文章，当前URL: {current_url}",
+                        "has_captcha": True,
+                        "current_url": current_url,
+                        "verification_result": verification_result
+                    }
+            elif is_sogou_link:
                 return {
                     "status": "error",
-                    "message": "页面被重定向到验证码页面，可能需要人工验证",
-                    "title": title,
-                    "url": url
+                    "message": f"重定向失败，当前URL: {current_url}",
+                    "current_url": current_url
                 }
-            
-            # 使用PDF转Markdown方法
-            pdf_result = await self.print_page_to_pdf(url)
+        
+        # 检查是否是微信文章页面，避免把验证码页面当作文章保存
+        title = await page.title()
+        if "搜狗搜索" in title or "验证码" in title:
+            return {
+                "status": "error",
+                "message": "页面被重定向到验证码页面，可能需要人工验证",
+                "has_captcha": True,
+                "title": title,
+                "current_url": current_url
+            }
+        
+        if is_sogou_link:
+            self.logger.info(f"成功重定向到微信文章: {current_url}")
+            url = current_url
+        
+        return {
+            "status": "success",
+            "url": url,
+            "title": title
+        }
+    
+    async def read_wechat_page(self, url: str) -> Dict[str, Any]:
+        """读取微信页面内容"""
+        if not self.page:
+            return {
+                "status": "error",
+                "message": "浏览器未初始化，请先调用setup_browser"
+            }
+        
+        async with self._borrow_page() as page:
+            return await self._read_wechat_page(page, url)
+    
+    async def _read_wechat_page(self, page, url: str) -> Dict[str, Any]:
+        """使用指定页面读取微信页面内容"""
+        try:
+            # 打开文章（含重定向和验证码处理）并生成PDF
+            pdf_result = await self._print_page_to_pdf(page, url)
             if pdf_result["status"] != "success":
                 return {
                     "status": "error",
                     "message": f"PDF打印失败: {pdf_result['message']}",
-                    "url": url
+                    "url": url,
+                    "has_captcha": pdf_result.get("has_captcha", False)
                 }
             
+            title = pdf_result["title"]
+            url = pdf_result["url"]
+            
             markdown_result = await self.pdf_to_markdown(pdf_result['pdf_path'])
             if markdown_result["status"] != "success":
                 return {
@@ -678,97 +794,82 @@ class WeChatScraper:
                 "error": str(e)
             }
     
-    async def print_page_to_pdf(self, url: str, output_path: str = None) -> Dict[str, Any]:
-        """将微信页面打印成PDF - 使用高级反爬虫策略"""
+    async def print_page_to_pdf(self, url: str, output_path: str = None, extract_markdown: bool = False) -> Dict[str, Any]:
+        """将微信页面打印成PDF - 使用高级反爬虫策略
+        
+        extract_markdown 为 True 且安装了 markdownify 时，在生成PDF的同时从DOM提取正文Markdown
+        """
+        if not self.page:
+            return {
+                "status": "error",
+                "message": "浏览器未初始化，请先调用setup_browser"
+            }
+        
+        async with self._borrow_page() as page:
+            return await self._print_page_to_pdf(page, url, output_path, extract_markdown)
+    
+    async def _print_page_to_pdf(self, page, url: str, output_path: str = None,
+                                 extract_markdown: bool = False) -> Dict[str, Any]:
+        """使用指定页面将微信页面打印成PDF"""
         try:
-            if not self.page:
-                return {
-                    "status": "error",
-                    "message": "浏览器未初始化，请先调用setup_browser"
-                }
-            
-            # 访问页面前先模拟人类行为
-            await self.stealth.simulate_human_behavior(self.page, duration=2)
-            
-            # 访问页面
-            await self.page.goto(url)
-            await self.page.wait_for_load_state("networkidle")
+            # 访问页面：处理搜狗重定向和验证码，未到达文章页时不生成PDF
+            open_result = await self._open_article(page, url)
+            if open_result["status"] != "success":
+                return open_result
+            url = open_result["url"]
             
             # 高级反爬虫等待策略
             await self.stealth.random_delay(3000, 6000)
             
             # 模拟人类行为
-            await self.stealth.simulate_human_behavior(self.page, duration=4)
+            await self.stealth.simulate_human_behavior(page, duration=4)
             
             # 额外等待页面完全加载
             await asyncio.sleep(5)
             
             # 模拟用户滚动页面，触发懒加载
-            await self.page.evaluate("window.scrollBy(0, 300)")
+            await page.evaluate("window.scrollBy(0, 300)")
             await asyncio.sleep(1)
-            await self.page.evaluate("window.scrollBy(0, 500)")
+            await page.evaluate("window.scrollBy(0, 500)")
             await asyncio.sleep(1)
-            await self.page.evaluate("window.scrollBy(0, 800)")
+            await page.evaluate("window.scrollBy(0, 800)")
             await asyncio.sleep(2)
             
+            # 在同一次导航中获取页面标题
+            title = await page.title()
+            
             # 生成PDF文件路径
             if output_path:
                 pdf_path = Path(output_path)
             else:
-                pdf_path = Path(__file__).parent.parent.parent / "data" / "pdfs" / f"wechat_{int(asyncio.get_event_loop().time())}.pdf"
+                pdf_path = Path(__file__).parent.parent.parent / "data" / "pdfs" / f"wechat_{int(time.time())}_{next(self._pdf_seq)}.pdf"
             
             pdf_path.parent.mkdir(parents=True, exist_ok=True)
             
             # 设置更长的超时时间
-            self.page.set_default_timeout(120000)  # 120秒超时
-            self.page.set_default_navigation_timeout(120000)  # 120秒导航超时
+            page.set_default_timeout(120000)  # 120秒超时
+            page.set_default_navigation_timeout(120000)  # 120秒导航超时
             
             # 等待页面完全加载
             await asyncio.sleep(5)
             
-            # 使用浏览器打印功能生成PDF，增加错误处理
-            try:
-                self.logger.info(f"开始生成PDF: {pdf_path}")
-                await self.page.pdf(
-                    path=str(pdf_path),
-                    format='A4',
-                    print_background=True,
-                    margin={
-                        'top': '1cm',
-                        'right': '1cm',
-                        'bottom': '1cm',
-                        'left': '1cm'
-                    }
+            # 生成PDF的同时从DOM提取正文，两者共用同一次导航
+            markdown_content = None
+            if extract_markdown and MARKDOWNIFY_AVAILABLE:
+                _, markdown_content = await asyncio.gather(
+                    self._render_pdf(page, pdf_path),
+                    self._extract_article_markdown(page)
                 )
-                self.logger.info(f"PDF生成完成: {pdf_path}")
-            except Exception as pdf_error:
-                # 如果PDF生成失败，尝试使用不同的参数
-                self.logger.warning(f"PDF生成失败，尝试备用参数: {pdf_error}")
-                try:
-                    await self.page.pdf(
-                        path=str(pdf_path),
-                        format='A4',
-                        print_background=True,
-                        margin={
-                            'top': '0.5cm',
-                            'right': '0.5cm',
-                            'bottom': '0.5cm',
-                            'left': '0.5cm'
-                        }
-                    )
-                except Exception as pdf_error2:
-                    # 如果仍然失败，尝试使用更简单的参数
-                    self.logger.warning(f"PDF生成再次失败，尝试简化参数: {pdf_error2}")
-                    await self.page.pdf(
-                        path=str(pdf_path),
-                        format='A4'
-                    )
+            else:
+                await self._render_pdf(page, pdf_path)
             
             return {
                 "status": "success",
                 "message": "成功将页面打印成PDF",
                 "url": url,
-                "pdf_path": str(pdf_path)
+                "title": title,
+                "pdf_path": str(pdf_path),
+                "markdown_content": markdown_content
             }
                 
         except Exception as e:
@@ -778,49 +879,72 @@ class WeChatScraper:
                 "error": str(e)
             }
     
+    async def _render_pdf(self, page, pdf_path: Path):
+        """使用浏览器打印功能生成PDF，失败时依次尝试备用参数"""
+        try:
+            self.logger.info(f"开始生成PDF: {pdf_path}")
+            await page.pdf(
+                path=str(pdf_path),
+                format='A4',
+                print_background=True,
+                margin={
+                    'top': '1cm',
+                    'right': '1cm',
+                    'bottom': '1cm',
+                    'left': '1cm'
+                }
+            )
+            self.logger.info(f"PDF生成完成: {pdf_path}")
+        except Exception as pdf_error:
+            # 如果PDF生成失败，尝试使用不同的参数
+            self.logger.warning(f"PDF生成失败，尝试备用参数: {pdf_error}")
+            try:
+                await page.pdf(
+                    path=str(pdf_path),
+                    format='A4',
+                    print_background=True,
+                    margin={
+                        'top': '0.5cm',
+                        'right': '0.5cm',
+                        'bottom': '0.5cm',
+                        'left': '0.5cm'
+                    }
+                )
+            except Exception as pdf_error2:
+                # 如果仍然失败，尝试使用更简单的参数
+                self.logger.warning(f"PDF生成再次失败，尝试简化参数: {pdf_error2}")
+                await page.pdf(
+                    path=str(pdf_path),
+                    format='A4'
+                )
+    
+    async def _extract_article_markdown(self, page) -> Optional[str]:
+        """从页面DOM提取文章正文并转换为Markdown，失败时返回None"""
+        try:
+            html = await page.evaluate(ARTICLE_CONTENT_JS)
+            if not html:
+                return None
+            markdown_content = (await asyncio.to_thread(html_to_markdown, html, heading_style="ATX")).strip()
+            return markdown_content or None
+        except Exception as e:
+            self.logger.warning(f"从DOM提取正文失败，将回退到PDF解析: {e}")
+            return None
+    
     async def pdf_to_markdown(self, pdf_path: str) -> Dict[str, Any]:
         """将PDF转换为Markdown"""
         try:
-            import PyPDF2
+            # 在线程中提取页面文本，避免阻塞事件循环
+            page_texts = await asyncio.to_thread(_extract_pdf_texts, pdf_path)
             
-            # 读取PDF文件
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # 提取所有页面的文本
-                text_content = ""
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text_content += page.extract_text() + "\n"
+            text_length = sum(len(page_text) + 1 for page_text in page_texts)
+            cleaned_lines = list(_clean_pdf_lines(page_texts))
             
-            if not text_content.strip():
+            if not cleaned_lines:
                 return {
                     "status": "error",
                     "message": "PDF中没有提取到文字内容"
                 }
             
-            # 清理和格式化文本
-            lines = text_content.split('\n')
-            cleaned_lines = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 移除多余的空白字符
-                line = re.sub(r'\s+', ' ', line)
-                
-                # 检测可能的标题
-                if (len(line) > 10 and 
-                    (line[0].isupper() or 
-                     '：' in line or ':' in line or
-                     '文章' in line or '内容' in line or
-                     '作者' in line or '时间' in line)):
-                    cleaned_lines.append(f"## {line}")
-                else:
-                    cleaned_lines.append(line)
-            
             # 生成Markdown内容
             markdown_content = "\n\n".join(cleaned_lines)
             
@@ -828,7 +952,7 @@ class WeChatScraper:
                 "status": "success",
                 "message": "成功将PDF转换为Markdown",
                 "pdf_path": pdf_path,
-                "text_length": len(text_content),
+                "text_length": text_length,
                 "markdown_content": markdown_content
             }
                 
@@ -841,52 +965,17 @@ class WeChatScraper:
     
     def clean_filename(self, title: str) -> str:
         """清理文件名，移除不合法字符并处理长度限制"""
-        if not title:
-            return "untitled"
-        
-        # 1. 移除特殊字符: < > : " / \ | ? *
-        title = re.sub(r'[<>:"/\\|?*]', '_', title)
-        
-        # 2. 替换多个空格为单个下划线
-        title = re.sub(r'\s+', '_', title)
-        
-        # 3. 移除中文标点符号并替换为下划线
-        title = re.sub(r'[，。！？；：""''【】《》（）]', '_', title)
-        
-        # 4. 移除连续的下划线
-        title = re.sub(r'_+', '_', title)
-        
-        # 5. 移除首尾的下划线和点
-        title = title.strip('_.')
-        
-        # 6. 限制文件名长度 (≤100字符)
-        if len(title) > 100:
-            title = title[:97] + "..."
-        
-        # 7. 如果清理后为空，使用默认名称
-        if not title:
-            title = "untitled"
-            
-        return title
+        return clean_filename(title)
     
     def _generate_unique_filename(self, base_name: str, extension: str, output_dir: Path) -> str:
-        """生成唯一的文件名，处理重复文件名"""
-        file_path = output_dir / f"{base_name}{extension}"
-        
-        if not file_path.exists():
-            return f"{base_name}{extension}"
-        
-        # 如果文件已存在，添加序号
-        counter = 1
-        while True:
-            new_name = f"{base_name}_{counter}{extension}"
-            new_path = output_dir / new_name
-            if not new_path.exists():
-                return new_name
-            counter += 1
+        """生成唯一的文件名，并以独占方式创建空占位文件预留该文件名"""
+        return generate_unique_filename(base_name, extension, output_dir)
     
     async def download_and_save_content(self, url: str, output_dir: Path, title: Optional[str] = None) -> Dict[str, Any]:
         """下载微信内容并保存为PDF和Markdown文件"""
+        # 预留的PDF文件名，保存失败时删除其空占位文件
+        target_pdf_path = None
+        saved = False
         try:
             # 1. 确保输出目录存在
             pdf_dir = output_dir / "pdfs"
@@ -894,91 +983,102 @@ class WeChatScraper:
             pdf_dir.mkdir(parents=True, exist_ok=True)
             markdown_dir.mkdir(parents=True, exist_ok=True)
             
-            # 2. 先确定文件名
-            page_result = await self.read_wechat_page(url)
-            page_title = ""
-            if page_result["status"] == "success":
-                page_title = page_result.get("title", "")
+            # 2. 生成PDF：提供标题时直接写入目标文件名；否则先写入临时文件，
+            #    由同一次页面导航取得标题后再重命名
+            if title:
+                clean_title = self.clean_filename(title)
+                target_pdf_path = pdf_dir / self._generate_unique_filename(clean_title, ".pdf", pdf_dir)
+                pdf_output_path = target_pdf_path
+            else:
+                pdf_output_path = pdf_dir / f".pending_{int(time.time())}_{next(self._pdf_seq)}.pdf"
             
-            # 使用提供的标题或页面标题
-            final_title = title if title else page_title
-            if not final_title:
-                final_title = f"wechat_content_{int(datetime.now().timestamp())}"
+            pdf_result = await self.print_page_to_pdf(url, str(pdf_output_path), extract_markdown=True)
+            if pdf_result["status"] != "success":
+                return {
+                    "status": "error",
+                    "message": f"PDF生成失败: {pdf_result['message']}"
+                }
+            
+            # 本篇文章统一使用同一个时间戳
+            now = datetime.now()
             
-            # 清理文件名
-            clean_title = self.clean_filename(final_title)
+            # 使用提供的标题或页面标题
+            final_title = title or pdf_result.get("title") or f"wechat_content_{int(now.timestamp())}"
             
-            # 生成唯一文件名
-            pdf_filename = self._generate_unique_filename(clean_title, ".pdf", pdf_dir)
-            markdown_filename = self._generate_unique_filename(clean_title, ".md", markdown_dir)
+            if target_pdf_path is None:
+                clean_title = self.clean_filename(final_title)
+                target_pdf_path = pdf_dir / self._generate_unique_filename(clean_title, ".pdf", pdf_dir)
+                await asyncio.to_thread(pdf_output_path.replace, target_pdf_path)
             
             # 确保PDF和Markdown使用相同的基础名称
+            pdf_filename = target_pdf_path.name
             base_name = pdf_filename.replace(".pdf", "")
             markdown_filename = f"{base_name}.md"
             
-            # 直接生成PDF到目标位置
-            target_pdf_path = pdf_dir / pdf_filename
-            pdf_result = await self.print_page_to_pdf(url, str(target_pdf_path))
-            if pdf_result["status"] != "success":
-                return {
-                    "status": "error",
-                    "message": f"PDF生成失败: {pdf_result['message']}"
-                }
-            
-            # 验证PDF文件是否真正创建
-            if not target_pdf_path.exists():
-                return {
-                    "status": "error",
-                    "message": f"PDF文件创建失败: {target_pdf_path}"
-                }
+            # 优先使用DOM提取的正文，否则从生成的PDF逐行提取
+            body_markdown = pdf_result.get("markdown_content")
+            if body_markdown:
+                body_lines = iter([body_markdown])
+            else:
+                try:
+                    page_texts = await asyncio.to_thread(_extract_pdf_texts, str(target_pdf_path))
+                except Exception as e:
+                    return {
+                        "status": "error",
+                        "message": f"内容提取失败: PDF转Markdown失败: {str(e)}"
+                    }
+                body_lines = _clean_pdf_lines(page_texts)
             
-            # 使用生成的PDF转换为Markdown
-            markdown_result = await self.pdf_to_markdown(str(target_pdf_path))
-            if markdown_result["status"] != "success":
+            first_line = next(body_lines, None)
+            if first_line is None:
                 return {
                     "status": "error",
-                    "message": f"内容提取失败: {markdown_result['message']}"
+                    "message": "内容提取失败: PDF中没有提取到文字内容"
                 }
             
-            # 保存Markdown文件
-            markdown_content = f"""# {final_title}
+            # 保存Markdown文件：先写文件头，再流式写入正文
+            markdown_header = f"""# {final_title}
 
 **来源**: {url}
-**保存时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**保存时间**: {now.strftime('%Y-%m-%d %H:%M:%S')}
 **来源平台**: 搜狗微信搜索
 
 ---
 
-{markdown_result['markdown_content']}
 """
             
             markdown_path = markdown_dir / markdown_filename
-            with open(markdown_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
-            
-            # 更新文件映射
-            mapping_file = output_dir / "file_mapping.json"
-            mapping_data = {}
-            
-            if mapping_file.exists():
-                try:
-                    with open(mapping_file, 'r', encoding='utf-8') as f:
-                        mapping_data = json.load(f)
-                except:
-                    mapping_data = {}
-            
-            mapping_data[base_name] = {
-                "original_title": final_title,
-                "clean_title": clean_title,
-                "url": url,
-                "pdf_file": f"pdfs/{pdf_filename}",
-                "markdown_file": f"markdown/{markdown_filename}",
-                "download_time": datetime.now().isoformat(),
-                "source": "wechat"
+            await asyncio.to_thread(_write_markdown, markdown_path, markdown_header,
+                                    itertools.chain([first_line], body_lines))
+            
+            # 追加文件映射记录（JSONL，每篇一行，无需重写整个映射文件；
+            # 单篇下载不更新 file_mapping.json，由 compact_mapping 合并）
+            mapping_file = output_dir / "file_mapping.jsonl"
+            mapping_entry = {
+                base_name: {
+                    "original_title": final_title,
+                    "clean_title": clean_title,
+                    "url": url,
+                    "pdf_file": f"pdfs/{pdf_filename}",
+                    "markdown_file": f"markdown/{markdown_filename}",
+                    "download_time": now.isoformat(),
+                    "source": "wechat"
+                }
             }
             
-            with open(mapping_file, 'w', encoding='utf-8') as f:
-                json.dump(mapping_data, f, ensure_ascii=False, indent=2)
+            # 等待后台写入完成后再返回成功，写入失败时向调用方报告错误
+            written = asyncio.get_running_loop().create_future()
+            await self._ensure_mapping_writer().put((mapping_file, json_bytes(mapping_entry, indent=False) + b"\n", written))
+            try:
+                await written
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "message": f"写入文件映射失败: {str(e)}",
+                    "url": url,
+                    "error": str(e)
+                }
+            saved = True
             
             return {
                 "status": "success",
@@ -1001,9 +1101,116 @@ class WeChatScraper:
                 "url": url,
                 "error": str(e)
             }
+        finally:
+            if target_pdf_path is not None and not saved:
+                discard_placeholder(target_pdf_path)
     
-    async def batch_download_content(self, query: str, output_dir: Path, max_pages: int = 3) -> Dict[str, Any]:
-        """批量下载微信搜索结果"""
+    def _ensure_mapping_writer(self) -> asyncio.Queue:
+        """确保文件映射后台写入任务已启动，返回写入队列"""
+        if self._mapping_writer_task is None or self._mapping_writer_task.done():
+            self._mapping_queue = asyncio.Queue()
+            self._mapping_writer_task = asyncio.create_task(self._mapping_writer(self._mapping_queue))
+        return self._mapping_queue
+    
+    async def _mapping_writer(self, queue: asyncio.Queue):
+        """后台合并写入文件映射记录：取出当前排队的记录，按文件一次追加写入，
+        写入结果通过每条记录附带的future通知调用方"""
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < MAPPING_FLUSH_BATCH:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            grouped: Dict[Path, List[bytes]] = {}
+            for mapping_file, line, _ in batch:
+                grouped.setdefault(mapping_file, []).append(line)
+            
+            errors: Dict[Path, Exception] = {}
+            try:
+                async with self._mapping_file_lock:
+                    for mapping_file, lines in grouped.items():
+                        try:
+                            await asyncio.to_thread(_append_bytes, mapping_file, b"".join(lines))
+                        except Exception as e:
+                            self.logger.error(f"写入文件映射失败: {e}")
+                            errors[mapping_file] = e
+            except asyncio.CancelledError:
+                # 写入任务被取消，未确认写入的记录不能报告成功
+                for _, _, written in batch:
+                    written.cancel()
+                raise
+            finally:
+                for mapping_file, _, written in batch:
+                    if not written.done():
+                        if mapping_file in errors:
+                            written.set_exception(errors[mapping_file])
+                        else:
+                            written.set_result(None)
+                    queue.task_done()
+    
+    async def flush_mapping(self):
+        """等待所有排队的文件映射记录写入磁盘"""
+        if self._mapping_queue is not None:
+            await self._mapping_queue.join()
+    
+    def rebuild_mapping_json(self, output_dir: Path) -> Path:
+        """将 file_mapping.jsonl 合并到 file_mapping.json，并移除已合并的 file_mapping.jsonl
+        
+        单篇下载只向 file_mapping.jsonl 追加记录，不再更新 file_mapping.json；
+        批量下载结束时自动合并，需要完整映射字典的调用方也可以调用本方法。
+        与后台追加并发时应持有 _mapping_file_lock（参见 compact_mapping）
+        """
+        mapping_json = output_dir / "file_mapping.json"
+        mapping_jsonl = output_dir / "file_mapping.jsonl"
+        # 先将待合并记录移到单独的文件；上次合并中断留下的文件优先合并
+        compacting = output_dir / "file_mapping.jsonl.compacting"
+        if mapping_jsonl.exists() and not compacting.exists():
+            mapping_jsonl.replace(compacting)
+        
+        mapping_data = {}
+        
+        if mapping_json.exists():
+            try:
+                with open(mapping_json, 'r', encoding='utf-8') as f:
+                    mapping_data = json.load(f)
+            except Exception as e:
+                self.logger.warning(f"读取文件映射失败，将重新生成: {e}")
+                mapping_data = {}
+        
+        if compacting.exists():
+            with open(compacting, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        mapping_data.update(json.loads(line))
+                    except json.JSONDecodeError as e:
+                        self.logger.warning(f"跳过损坏的映射记录: {e}")
+        
+        # 先写临时文件再替换，写入中断时不会损坏已有映射，也不会丢失待合并记录
+        tmp_json = output_dir / "file_mapping.json.tmp"
+        with open(tmp_json, 'wb') as f:
+            f.write(json_bytes(mapping_data))
+        tmp_json.replace(mapping_json)
+        compacting.unlink(missing_ok=True)
+        
+        return mapping_json
+    
+    async def compact_mapping(self, output_dir: Path) -> Path:
+        """写完排队的映射记录后合并到 file_mapping.json"""
+        await self.flush_mapping()
+        async with self._mapping_file_lock:
+            return await asyncio.to_thread(self.rebuild_mapping_json, output_dir)
+    
+    async def batch_download_content(self, query: str, output_dir: Path, max_pages: int = 3,
+                                     max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """批量下载微信搜索结果
+        
+        max_concurrency 控制同时下载的文章数，默认等于页面池大小
+        """
         try:
             # 1. 搜索内容
             search_result = await self.search_wechat(query, max_pages)
@@ -1021,48 +1228,75 @@ class WeChatScraper:
                     "message": "没有找到符合条件的结果"
                 }
             
-            # 2. 批量下载
-            success_count = 0
-            failed_count = 0
-            download_results = []
+            # 2. 批量下载（信号量限制并发数）
+            semaphore = asyncio.Semaphore(max(1, max_concurrency or self.page_pool_size))
+            total = len(results)
             
-            for i, article in enumerate(results, 1):
+            async def download_one(i: int, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 url = article.get("link", "")
                 title = article.get("title", "")
                 
                 if not url:
-                    failed_count += 1
-                    continue
-                
-                self.logger.info(f"下载第 {i}/{len(results)} 篇: {title}")
+                    return None
                 
-                # 下载单篇文章
-                download_result = await self.download_and_save_content(url, output_dir, title)
+                async with semaphore:
+                    # 随机等待，避免请求过快
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+                    self.logger.info("下载第 %d/%d 篇: %s", i, total, title)
+                    
+                    # 下载单篇文章
+                    download_result = await self.download_and_save_content(url, output_dir, title)
                 
                 if download_result["status"] == "success":
-                    success_count += 1
-                    download_results.append({
+                    return {
                         "title": title,
                         "url": url,
                         "status": "success",
                         "files": download_result["files"]
-                    })
-                else:
+                    }
+                return {
+                    "title": title,
+                    "url": url,
+                    "status": "failed",
+                    "error": download_result.get("message", "未知错误")
+                }
+            
+            outcomes = await asyncio.gather(
+                *[download_one(i, article) for i, article in enumerate(results, 1)],
+                return_exceptions=True
+            )
+            
+            success_count = 0
+            failed_count = 0
+            download_results = []
+            
+            for article, outcome in zip(results, outcomes):
+                if outcome is None:
                     failed_count += 1
-                    download_results.append({
-                        "title": title,
-                        "url": url,
+                    continue
+                
+                if isinstance(outcome, Exception):
+                    outcome = {
+                        "title": article.get("title", ""),
+                        "url": article.get("link", ""),
                         "status": "failed",
-                        "error": download_result.get("message", "未知错误")
-                    })
+                        "error": str(outcome)
+                    }
                 
-                # 等待一下，避免请求过快
-                await asyncio.sleep(1)
+                if outcome["status"] == "success":
+                    success_count += 1
+                else:
+                    failed_count += 1
+                download_results.append(outcome)
+            
+            # 3. 合并文件映射并生成批量下载总结
+            if success_count:
+                await self.compact_mapping(output_dir)
             
-            # 3. 生成批量下载总结
+            now = datetime.now()
             summary = {
                 "query": query,
-                "download_time": datetime.now().isoformat(),
+                "download_time": now.isoformat(),
                 "total_found": len(results),
                 "success_count": success_count,
                 "failed_count": failed_count,
@@ -1070,9 +1304,8 @@ class WeChatScraper:
                 "results": download_results
             }
             
-            summary_file = output_dir / f"wechat_batch_download_summary_{query}_{int(datetime.now().timestamp())}.json"
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, ensure_ascii=False, indent=2)
+            summary_file = output_dir / f"wechat_batch_download_summary_{query}_{int(now.timestamp())}.json"
+            await asyncio.to_thread(summary_file.write_bytes, json_bytes(summary))
             
             return {
                 "status": "success",
@@ -1096,12 +1329,19 @@ class WeChatScraper:
     async def cleanup(self):
         """清理资源"""
         try:
+            # 先写完排队的文件映射记录，再停止后台写入任务
+            await self.flush_mapping()
+            if self._mapping_writer_task:
+                self._mapping_writer_task.cancel()
+                self._mapping_writer_task = None
+            
             if self.browser:
                 await self.browser.close()
             if self.context and not self.user_data_dir:
                 await self.context.close()
             if self.playwright:
                 await self.playwright.stop()
+            self._page_pool = None
             self.logger.info("资源清理完成")
         except Exception as e:
             self.logger.error(f"资源清理失败: {e}")
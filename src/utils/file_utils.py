@@ -0,0 +1,98 @@
+"""文件工具模块
+
+抓取器共用的文件名清理、文件名预留和JSON序列化工具
+"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+# 可选的快速JSON序列化，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 文件名清理字符表：特殊字符 < > : " / \ | ? *、空白字符和中文标点一次性替换为下划线
+_FN_WHITESPACE_CHARS = ''.join(chr(c) for c in range(0x3001) if chr(c).isspace())
+_FN_TRANSLATE = str.maketrans(dict.fromkeys('<>:"/\\|?*' + _FN_WHITESPACE_CHARS + '，。！？；：""【】《》（）', '_'))
+_FN_UNDERSCORES = re.compile(r'_+')
+# 纯ASCII标题中需要替换的字符，用于跳过无需清理的标题
+_FN_ASCII_SPECIAL = frozenset('<>:"/\\|?*' + ''.join(c for c in _FN_WHITESPACE_CHARS if c.isascii()))
+
+
+def clean_filename(title: str) -> str:
+    """清理文件名，移除不合法字符并处理长度限制"""
+    if not title:
+        return "untitled"
+    
+    # 纯ASCII且不含特殊字符和连续下划线的标题无需替换，跳过第1、2步
+    if not title.isascii() or not _FN_ASCII_SPECIAL.isdisjoint(title) or '__' in title:
+        # 1. 特殊字符 < > : " / \ | ? *、空白字符和中文标点替换为下划线
+        title = title.translate(_FN_TRANSLATE)
+        
+        # 2. 移除连续的下划线
+        title = _FN_UNDERSCORES.sub('_', title)
+    
+    # 3. 移除首尾的下划线和点
+    title = title.strip('_.')
+    
+    # 4. 限制文件名长度 (≤100字符)
+    if len(title) > 100:
+        title = title[:97] + "..."
+    
+    # 5. 如果清理后为空，使用默认名称
+    if not title:
+        title = "untitled"
+    
+    return title
+
+
+def generate_unique_filename(base_name: str, extension: str, output_dir: Path) -> str:
+    """生成唯一的文件名，并以独占方式创建空占位文件预留该文件名
+    
+    查找与创建之间没有await，同时使用 O_CREAT|O_EXCL，并发下载同名文章时不会选到同一个文件名
+    """
+    # 一次性读取目录快照，跳过已知存在的文件名，避免逐个候选文件名尝试创建
+    with os.scandir(output_dir) as entries:
+        existing = {entry.name for entry in entries}
+    
+    counter = 0
+    while True:
+        # 如果文件已存在，添加序号
+        filename = f"{base_name}_{counter}{extension}" if counter else f"{base_name}{extension}"
+        counter += 1
+        if filename in existing:
+            continue
+        try:
+            fd = os.open(output_dir / filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return filename
+
+
+def discard_placeholder(path: Path) -> None:
+    """删除预留文件名时创建的空占位文件（已写入内容的文件保留）"""
+    try:
+        if path.stat().st_size == 0:
+            path.unlink()
+    except OSError:
+        pass
+
+
+def json_bytes(data: Any, indent: bool = True) -> bytes:
+    """将数据序列化为UTF-8编码的JSON字节串（保留中文字符）"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def json_loads(data: bytes) -> Any:
+    """解析UTF-8编码的JSON字节串"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,47 +1,55 @@
 """日志管理模块"""
+import functools
 import logging
 from pathlib import Path
 from typing import Optional
 
 
-class Logger:
-    """日志管理类"""
+@functools.lru_cache(maxsize=None)
+def _configure_handlers(name: str, log_file: Optional[str] = None) -> logging.Logger:
+    """为日志器添加处理器，相同参数只配置一次"""
+    logger = logging.getLogger(name)
     
-    def __init__(self, name: str = "scraper-toolkit", level: str = "INFO", log_file: Optional[str] = None):
-        self.logger = logging.getLogger(name)
-        self.logger.setLevel(getattr(logging, level.upper()))
+    # 如果没有处理器，添加处理器
+    if not logger.handlers:
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
         
-        # 如果没有处理器，添加处理器
-        if not self.logger.handlers:
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            
-            # 添加控制台处理器
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
-            
-            # 如果指定了日志文件，添加文件处理器
-            if log_file:
-                log_path = Path(log_file)
-                log_path.parent.mkdir(parents=True, exist_ok=True)
-                file_handler = logging.FileHandler(log_path)
-                file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
-    
-    def info(self, message: str):
-        """记录信息日志"""
-        self.logger.info(message)
+        # 添加控制台处理器
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+        
+        # 如果指定了日志文件，添加文件处理器
+        if log_file:
+            log_path = Path(log_file)
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            file_handler = logging.FileHandler(log_path)
+            file_handler.setFormatter(formatter)
+            logger.addHandler(file_handler)
     
-    def error(self, message: str):
-        """记录错误日志"""
-        self.logger.error(message)
+    return logger
+
+
+def get_logger(name: str = "scraper-toolkit", level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
+    """获取配置好的日志器：处理器只配置一次，每次调用都应用指定的日志级别"""
+    logger = _configure_handlers(name, log_file)
+    logger.setLevel(getattr(logging, level.upper()))
+    return logger
+
+
+class Logger:
+    """日志管理类
     
-    def warning(self, message: str):
-        """记录警告日志"""
-        self.logger.warning(message)
+    info/error/warning/debug 直接绑定到底层 logging.Logger，没有额外的转发调用；
+    支持 logger.info("...%s", value) 形式的延迟格式化，级别被过滤时不做格式化
+    """
     
-    def debug(self, message: str):
-        """记录调试日志"""
-        self.logger.debug(message)
+    def __init__(self, name: str = "scraper-toolkit", level: str = "INFO", log_file: Optional[str] = None):
+        self.logger = get_logger(name, level, log_file)
+        self.info = self.logger.info
+        self.error = self.logger.error
+        self.warning = self.logger.warning
+        self.debug = self.logger.debug
+        self.isEnabledFor = self.logger.isEnabledFor
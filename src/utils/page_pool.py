@@ -0,0 +1,33 @@
+"""页面池模块
+
+多个并发下载共享一组浏览器页面，每个页面同一时间只被一个任务使用
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+
+class PagePool:
+    """浏览器页面池：首次借用时补齐额外页面，借用完毕后归还"""
+    
+    def __init__(self, first_page: Any, size: int, new_page: Callable[[], Awaitable[Any]]):
+        self.size = max(1, size)
+        self._new_page = new_page
+        self._pages: asyncio.Queue = asyncio.Queue()
+        self._pages.put_nowait(first_page)
+        self._filled = False
+    
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator[Any]:
+        """借用一个页面，使用完毕后归还"""
+        if not self._filled:
+            # 先标记再创建额外页面，避免并发调用重复创建
+            self._filled = True
+            for _ in range(self.size - 1):
+                self._pages.put_nowait(await self._new_page())
+        
+        page = await self._pages.get()
+        try:
+            yield page
+        finally:
+            self._pages.put_nowait(page)